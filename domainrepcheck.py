@@ -4,183 +4,362 @@
 import argparse
 from datetime import datetime
 import sys
-from typing import List, Dict
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, List, Dict, FrozenSet, NamedTuple, Optional, TextIO, Tuple
 import logging
+import mmap
 import os
-import requests
-import json
+import asyncio
+import contextlib
+import dbm
+import aiohttp
+import functools
+import glob
+import orjson
+import shelve
+import stat
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Dont forget to get your APIs for the below websites.
 
-def apivoid_domain_reputation(domain: str) -> dict:
+# Timeout applied to every reputation API request
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+# Maximum number of simultaneous connections held by the shared session, overall and per provider host
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 32
+
+# Default maximum number of in-flight requests to each reputation service
+DEFAULT_CONCURRENCY = 10
+
+# Transient failures are retried with exponential backoff
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Provider(NamedTuple):
+    """
+    Description of a reputation service.
+
+    Attributes:
+        name (str): Name shown in the report and used in cache keys.
+        env (str): Environment variable holding the API key.
+        url (str): Endpoint URL, with {domain} replaced by the domain to check.
+        auth (str): 'query:<param>' to send the key as a query parameter, or 'bearer'
+            to send it in an Authorization header.
+        expected (Tuple[str, ...]): Top-level keys a successful response must contain.
+        extract (Callable[[dict], dict]): Picks the relevant fields out of the JSON response.
+        domain_param (Optional[str]): Query parameter carrying the domain, if not part of the URL.
     """
-    Check domain reputation using APIVoid API.
+    name: str
+    env: str
+    url: str
+    auth: str
+    expected: Tuple[str, ...]
+    extract: Callable[[dict], dict]
+    domain_param: Optional[str] = None
+
+
+# Reputation services queried for every website not on the preset list.
+# If needed, you can add more checker resources below.
+PROVIDERS: List[Provider] = [
+    Provider(
+        name='APIVoid',
+        env='APIVOID_API_KEY',
+        url='https://endpoint.apivoid.com/domainrep/v1/pay-as-you-go/',
+        auth='query:key',
+        domain_param='domain',
+        expected=('data',),
+        extract=lambda data: {
+            'reputation_score': data.get('data', {}).get('reputation', {}).get('score', 'N/A'),
+            'blacklist_status': data.get('data', {}).get('blacklists', 'N/A')
+        }
+    ),
+    Provider(
+        name='IPVoid',
+        env='IPVVOID_API_KEY',
+        url='https://api.ipvoid.com/domain/{domain}/',
+        auth='query:key',
+        expected=('Blacklists',),
+        extract=lambda data: {
+            'blacklist_count': data.get('Blacklists', 'N/A'),
+            'details': data.get('Details', 'N/A')
+        }
+    ),
+    Provider(
+        name='MXToolbox',
+        env='MXTOOLBOX_API_KEY',
+        url='https://api.mxtoolbox.com/api/v1/lookup/health/{domain}',
+        auth='bearer',
+        expected=('Health',),
+        extract=lambda data: {
+            'health_status': data.get('Health', 'N/A'),
+            'details': data.get('Details', 'N/A')
+        }
+    ),
+]
 
-    Args:
-        domain (str): The domain to check.
+# Location and default lifetime (in seconds) of cached reputation lookups
+CACHE_PATH = os.path.expanduser('~/.cache/domainrep/cache')
+DEFAULT_CACHE_TTL = 86400
 
-    Returns:
-        dict: Reputation data or error message.
+# Errors raised by shelve when the cache files are unusable or corrupt
+CACHE_OPEN_ERRORS = dbm.error + (ValueError, SyntaxError)
+
+
+class ReputationCache:
     """
-    api_key = os.getenv('APIVOID_API_KEY')
-    if not api_key:
-        logging.error("APIVOID_API_KEY not set in environment variables.")
-        return {'error': 'API key not provided'}
+    On-disk cache of reputation lookups that expire after a fixed TTL.
 
-    url = 'https://endpoint.apivoid.com/domainrep/v1/pay-as-you-go/'
-    params = {
-        'key': api_key,
-        'domain': domain
-    }
+    Entries are stored as (timestamp, value) pairs so expiry can be checked on read.
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        # Extract relevant information
-        reputation_score = data.get('data', {}).get('reputation', {}).get('score', 'N/A')
-        blacklist_status = data.get('data', {}).get('blacklists', 'N/A')
-        return {
-            'reputation_score': reputation_score,
-            'blacklist_status': blacklist_status
-        }
-    except requests.RequestException as e:
-        logging.error(f"APIVoid API request failed for domain {domain}: {e}")
-        return {'error': str(e)}
-    except json.JSONDecodeError:
-        logging.error(f"Failed to parse APIVoid API response for domain {domain}.")
-        return {'error': 'Invalid JSON response'}
+    The cache is a shelve file and only supports one run at a time: depending on the dbm
+    backend a second concurrent run either cannot open it or may lose entries.
+    """
+
+    def __init__(self, path: str, ttl: int):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self._shelf = shelve.open(path)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Return the cached value for key, or None if it is missing or expired.
+        """
+        entry = self._shelf.get(key)
+        if entry is None:
+            return None
+        timestamp, value = entry
+        if timestamp + self.ttl > time.time():
+            return value
+        del self._shelf[key]
+        return None
+
+    def set(self, key: str, value: dict) -> None:
+        """
+        Store value under key, stamped with the current time.
+        """
+        self._shelf[key] = (time.time(), value)
+
+    def close(self) -> None:
+        self._shelf.close()
+
+
+# Cache used by the provider functions, opened by check_reputation when caching is enabled
+_cache: Optional[ReputationCache] = None
+
+# Lookups currently in progress, keyed by (provider name, domain)
+_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+# Most recently parsed preset list per path, stored with the file's modification time
+_preset_cache: Dict[str, Tuple[float, FrozenSet[str]]] = {}
 
 
-def ipvoid_domain_reputation(domain: str) -> dict:
+def cached(func):
     """
-    Check domain reputation using IPVoid API.
+    Decorator that serves a provider lookup from the reputation cache when possible.
 
-    Args:
-        domain (str): The domain to check.
+    Results are keyed by provider name and domain. Error responses are never cached
+    so transient failures are retried on the next run.
+    """
+    @functools.wraps(func)
+    async def wrapper(session: aiohttp.ClientSession, provider: Provider, domain: str,
+                      semaphore: asyncio.Semaphore) -> dict:
+        key = f"{provider.name}:{domain}"
+        if _cache is not None:
+            result = _cache.get(key)
+            if result is not None:
+                logging.debug(f"Using cached {provider.name} result for domain {domain}.")
+                return result
+
+        result = await func(session, provider, domain, semaphore)
+        if _cache is not None and 'error' not in result:
+            _cache.set(key, result)
+        return result
+    return wrapper
+
+
+def deduplicated(func):
+    """
+    Decorator that shares one in-flight provider lookup between concurrent callers.
 
-    Returns:
-        dict: Reputation data or error message.
+    A caller asking for a (provider, domain) pair that is already being fetched awaits
+    the existing request instead of sending a duplicate one. The request itself keeps
+    running if one of its callers is cancelled.
     """
-    api_key = os.getenv('IPVVOID_API_KEY')
-    if not api_key:
-        logging.error("IPVVOID_API_KEY not set in environment variables.")
-        return {'error': 'API key not provided'}
+    @functools.wraps(func)
+    async def wrapper(session: aiohttp.ClientSession, provider: Provider, domain: str,
+                      semaphore: asyncio.Semaphore) -> dict:
+        key = (provider.name, domain)
+        future = _inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(session, provider, domain, semaphore))
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+        else:
+            logging.debug(f"Waiting for in-flight {provider.name} lookup of domain {domain}.")
+        # Shielded so a cancelled caller does not cancel the lookup for everyone else
+        return await asyncio.shield(future)
+    return wrapper
 
-    url = f'https://api.ipvoid.com/domain/{domain}/'
-    params = {
-        'key': api_key
-    }
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        # Extract relevant information
-        blacklist_count = data.get('Blacklists', 'N/A')
-        return {
-            'blacklist_count': blacklist_count,
-            'details': data.get('Details', 'N/A')
-        }
-    except requests.RequestException as e:
-        logging.error(f"IPVoid API request failed for domain {domain}: {e}")
-        return {'error': str(e)}
-    except json.JSONDecodeError:
-        logging.error(f"Failed to parse IPVoid API response for domain {domain}.")
-        return {'error': 'Invalid JSON response'}
+async def fetch_json(session: aiohttp.ClientSession, url: str, **kwargs) -> dict:
+    """
+    Send a GET request over the shared session and decode the JSON response.
 
+    Connection errors, timeouts and retryable HTTP statuses are retried with
+    exponential backoff before the error is raised to the caller.
 
-def mxtoolbox_domain_reputation(domain: str) -> dict:
+    Args:
+        session (aiohttp.ClientSession): Shared HTTP session.
+        url (str): The URL to request.
+        **kwargs: Extra arguments for session.get, such as params or headers.
+
+    Returns:
+        dict: The decoded JSON response.
+    """
+    for attempt in range(RETRY_ATTEMPTS + 1):
+        if attempt:
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            async with session.get(url, timeout=REQUEST_TIMEOUT, **kwargs) as response:
+                if response.status not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS:
+                    response.raise_for_status()
+                    return orjson.loads(await response.read())
+                logging.debug(f"Retrying {url} after HTTP status {response.status}.")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt == RETRY_ATTEMPTS:
+                raise
+            logging.debug(f"Retrying {url} after error: {e}")
+
+
+@deduplicated
+@cached
+async def provider_domain_reputation(session: aiohttp.ClientSession, provider: Provider, domain: str,
+                                     semaphore: asyncio.Semaphore) -> dict:
     """
-    Check domain reputation using MXToolbox API.
+    Check domain reputation using a single reputation service.
 
     Args:
+        session (aiohttp.ClientSession): Shared HTTP session.
+        provider (Provider): The reputation service to query.
         domain (str): The domain to check.
+        semaphore (asyncio.Semaphore): Limits in-flight requests to this service.
 
     Returns:
         dict: Reputation data or error message.
     """
-    api_key = os.getenv('MXTOOLBOX_API_KEY')
+    api_key = os.getenv(provider.env)
     if not api_key:
-        logging.error("MXTOOLBOX_API_KEY not set in environment variables.")
+        logging.error(f"{provider.env} not set in environment variables.")
         return {'error': 'API key not provided'}
 
-    url = f'https://api.mxtoolbox.com/api/v1/lookup/health/{domain}'
-    headers = {
-        'Authorization': f'Bearer {api_key}'
-    }
+    url = provider.url.format(domain=domain)
+    params = {}
+    headers = {}
+    if provider.domain_param:
+        params[provider.domain_param] = domain
+    if provider.auth == 'bearer':
+        headers['Authorization'] = f'Bearer {api_key}'
+    else:
+        params[provider.auth.split(':', 1)[1]] = api_key
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        async with semaphore:
+            data = await fetch_json(session, url, params=params, headers=headers)
+        # Error bodies and unexpected shapes are reported as errors so they are never cached
+        if not isinstance(data, dict) or 'error' in data:
+            error = data.get('error') if isinstance(data, dict) else 'Unexpected response'
+            logging.error(f"{provider.name} API returned an error for domain {domain}: {error}")
+            return {'error': str(error)}
+        missing = [key for key in provider.expected if key not in data]
+        if missing:
+            logging.error(f"{provider.name} API response for domain {domain} is missing {', '.join(missing)}.")
+            return {'error': 'Unexpected response'}
         # Extract relevant information
-        health_status = data.get('Health', 'N/A')
-        return {
-            'health_status': health_status,
-            'details': data.get('Details', 'N/A')
-        }
-    except requests.RequestException as e:
-        logging.error(f"MXToolbox API request failed for domain {domain}: {e}")
+        return provider.extract(data)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error(f"{provider.name} API request failed for domain {domain}: {e}")
         return {'error': str(e)}
-    except json.JSONDecodeError:
-        logging.error(f"Failed to parse MXToolbox API response for domain {domain}.")
+    except orjson.JSONDecodeError:
+        logging.error(f"Failed to parse {provider.name} API response for domain {domain}.")
         return {'error': 'Invalid JSON response'}
 
 
-def aggregate_reputation(domain: str) -> dict:
+async def aggregate_reputation(session: aiohttp.ClientSession, domain: str,
+                               semaphores: Dict[str, asyncio.Semaphore]) -> dict:
     """
-    Aggregate domain reputation from multiple services.
+    Aggregate domain reputation from all reputation services concurrently.
 
     Args:
+        session (aiohttp.ClientSession): Shared HTTP session.
         domain (str): The domain to check.
+        semaphores (Dict[str, asyncio.Semaphore]): Per-service limits on in-flight requests.
 
     Returns:
         dict: Aggregated reputation data.
     """
-    reputation_data = {
-        'domain': domain,
-        'APIVoid': {},
-        'IPVoid': {},
-        'MXToolbox': {}
-    }
+    reputation_data = {'domain': domain}
 
-    # APIVoid
-    apivoid_result = apivoid_domain_reputation(domain)
-    reputation_data['APIVoid'] = apivoid_result
+    results = await asyncio.gather(
+        *(provider_domain_reputation(session, provider, domain, semaphores[provider.name])
+          for provider in PROVIDERS),
+        return_exceptions=True
+    )
 
-    # IPVoid
-    ipvoid_result = ipvoid_domain_reputation(domain)
-    reputation_data['IPVoid'] = ipvoid_result
+    # Unexpected failures are reported per service rather than aborting the whole domain
+    for provider, result in zip(PROVIDERS, results):
+        # BaseException also covers a CancelledError returned by gather
+        if isinstance(result, BaseException):
+            message = str(result) or type(result).__name__
+            logging.error(f"{provider.name} check failed for domain {domain}: {message}")
+            result = {'error': message}
+        reputation_data[provider.name] = result
 
-    # MXToolbox
-    mxtoolbox_result = mxtoolbox_domain_reputation(domain)
-    reputation_data['MXToolbox'] = mxtoolbox_result
+    return reputation_data
 
-    # If needed, you can add more checker resources below.
 
-    return reputation_data
+def read_text(path: str) -> str:
+    """
+    Read a whole text file at once, through a memory map when it is a regular file.
 
+    Args:
+        path (str): Path to the file.
 
-def check_reputation(websites: List[str], preset_list_path: str, specific_websites: List[str]) -> Dict[str, dict]:
+    Returns:
+        str: The decoded file contents.
     """
-    Check the reputation of websites against a preset list, specific websites, and external APIs.
+    with open(path, 'rb') as file:
+        # Only non-empty regular files can be memory mapped; pipes and FIFOs are read normally
+        file_stat = os.fstat(file.fileno())
+        if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size == 0:
+            return file.read().decode()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Decode straight from the mapping instead of copying it into bytes first
+            return str(mm, 'utf-8')
+
+
+def load_preset_list(preset_list_path: str) -> FrozenSet[str]:
+    """
+    Load the preset list of unsafe websites, reusing the parsed set while the file is unchanged.
 
     Args:
-        websites (List[str]): List of websites to check.
         preset_list_path (str): Path to the preset list file.
-        specific_websites (List[str]): Additional websites to mark as unsafe.
 
     Returns:
-        Dict[str, dict]: Dictionary mapping websites to their reputation data.
+        FrozenSet[str]: Lowercased websites from the preset list.
     """
-    results = {}
     try:
-        with open(preset_list_path, 'r') as file:
-            preset_websites = set(line.strip().lower() for line in file if line.strip())
+        mtime = os.path.getmtime(preset_list_path)
+        cached_entry = _preset_cache.get(preset_list_path)
+        if cached_entry is None or cached_entry[0] != mtime:
+            # Lowercase the whole file in one call instead of once per line
+            lines = read_text(preset_list_path).lower().splitlines()
+            # Replacing the entry drops the set parsed from an older version of the file
+            _preset_cache[preset_list_path] = (mtime, frozenset(filter(None, (line.strip() for line in lines))))
     except FileNotFoundError:
         logging.error(f"The file {preset_list_path} was not found.")
         sys.exit(1)
@@ -188,20 +367,216 @@ def check_reputation(websites: List[str], preset_list_path: str, specific_websit
         logging.error(f"Could not read the file {preset_list_path}.")
         sys.exit(1)
 
-    preset_websites.update(site.lower() for site in specific_websites)
+    return _preset_cache[preset_list_path][1]
+
+
+def open_reputation_cache(path: str, ttl: int) -> Optional[ReputationCache]:
+    """
+    Open the reputation cache, recovering from a corrupt cache where possible.
+
+    A run killed while writing can leave a half-written index behind, which dbm.dumb
+    refuses to parse. Such files are renamed with a .corrupt suffix and a fresh cache
+    is started in their place.
+
+    Args:
+        path (str): Base path of the cache files.
+        ttl (int): Seconds to keep cached API results.
 
+    Returns:
+        Optional[ReputationCache]: The open cache, or None if it could not be opened.
+    """
+    try:
+        return ReputationCache(path, ttl)
+    except (ValueError, SyntaxError) as e:
+        logging.warning(f"The cache {path} is corrupt, moving it aside: {e}")
+        try:
+            for name in glob.glob(glob.escape(path) + '*'):
+                if not name.endswith('.corrupt'):
+                    os.replace(name, name + '.corrupt')
+            return ReputationCache(path, ttl)
+        except CACHE_OPEN_ERRORS as e:
+            logging.warning(f"Could not open the cache {path}, continuing without it: {e}")
+    except dbm.error as e:
+        logging.warning(f"Could not open the cache {path}, continuing without it: {e}")
+    return None
+
+
+@contextlib.contextmanager
+def reputation_cache(cache_ttl: Optional[int]) -> Iterator[Optional[ReputationCache]]:
+    """
+    Open the on-disk reputation cache for the provider lookups made inside the block.
+
+    If the cache cannot be opened a warning is logged and the lookups run uncached.
+
+    Args:
+        cache_ttl (Optional[int]): Seconds to keep cached API results, or None to disable caching.
+
+    Yields:
+        Optional[ReputationCache]: The open cache, or None when caching is off.
+    """
+    global _cache
+    if cache_ttl is not None:
+        _cache = open_reputation_cache(CACHE_PATH, cache_ttl)
+    try:
+        yield _cache
+    finally:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+
+
+def build_preset_websites(preset_list_path: str, specific_websites: List[str]) -> FrozenSet[str]:
+    """
+    Combine the preset list file with the specific websites to mark as unsafe.
+
+    Args:
+        preset_list_path (str): Path to the preset list file.
+        specific_websites (List[str]): Additional websites to mark as unsafe.
+
+    Returns:
+        FrozenSet[str]: Lowercased websites to report as unsafe.
+    """
+    return load_preset_list(preset_list_path) | {site.lower() for site in specific_websites}
+
+
+async def iter_reputation(websites: List[str], preset_websites: FrozenSet[str],
+                          concurrency: int = DEFAULT_CONCURRENCY) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Check the reputation of websites, yielding each result as soon as it is available.
+
+    Preset list matches are yielded first. Websites that are not on the preset list are
+    checked concurrently over a single shared HTTP session and yielded in the order they
+    finish. Lookups use the cache opened by reputation_cache, if any.
+
+    Args:
+        websites (List[str]): List of websites to check.
+        preset_websites (FrozenSet[str]): Lowercased websites to report as unsafe.
+        concurrency (int): Maximum number of in-flight requests to each reputation service.
+
+    Yields:
+        Tuple[str, dict]: A website and its reputation data.
+    """
+    # Each run gets its own limits so concurrent runs cannot replace each other's
+    semaphores = {provider.name: asyncio.Semaphore(concurrency) for provider in PROVIDERS}
+
+    async def check_website(session: aiohttp.ClientSession, website: str) -> Tuple[str, dict]:
+        return website, await aggregate_reputation(session, website.lower(), semaphores)
+
+    non_preset_websites = []
     for website in websites:
-        normalized_website = website.lower()
-        if normalized_website in preset_websites:
-            results[website] = {"preset_status": "Unsafe"}
+        if website.lower() in preset_websites:
+            yield website, {"preset_status": "Unsafe"}
         else:
-            # Perform external reputation checks
-            reputation = aggregate_reputation(normalized_website)
-            results[website] = reputation
+            non_preset_websites.append(website)
+
+    # Perform external reputation checks
+    connector = aiohttp.TCPConnector(limit=CONNECTION_LIMIT, limit_per_host=CONNECTION_LIMIT_PER_HOST)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [asyncio.ensure_future(check_website(session, website)) for website in non_preset_websites]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Stop outstanding lookups if the caller gives up early
+            for task in tasks:
+                task.cancel()
+
 
+async def check_reputation(websites: List[str], preset_list_path: str, specific_websites: List[str],
+                           cache_ttl: Optional[int] = DEFAULT_CACHE_TTL,
+                           concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, dict]:
+    """
+    Check the reputation of websites against a preset list, specific websites, and external APIs.
+
+    Args:
+        websites (List[str]): List of websites to check.
+        preset_list_path (str): Path to the preset list file.
+        specific_websites (List[str]): Additional websites to mark as unsafe.
+        cache_ttl (Optional[int]): Seconds to keep cached API results, or None to disable caching.
+        concurrency (int): Maximum number of in-flight requests to each reputation service.
+
+    Returns:
+        Dict[str, dict]: Dictionary mapping websites to their reputation data, in input order.
+    """
+    preset_websites = build_preset_websites(preset_list_path, specific_websites)
+    results = dict.fromkeys(websites)
+    with reputation_cache(cache_ttl):
+        async for website, reputation in iter_reputation(websites, preset_websites, concurrency):
+            results[website] = reputation
     return results
 
 
+def write_website_report(out: TextIO, website: str, reputation: dict) -> None:
+    """
+    Write the report block for a single website.
+
+    Args:
+        out (TextIO): Stream to write the report to.
+        website (str): The website that was checked.
+        reputation (dict): Reputation data for the website.
+    """
+    out.write(f"\nWebsite: {website}\n")
+    if "preset_status" in reputation:
+        out.write(f"  Preset List Status: {reputation['preset_status']}\n")
+    else:
+        for service, data in reputation.items():
+            out.write(f"  {service} Reputation:\n")
+            if isinstance(data, dict):
+                # Pretty-print the JSON data
+                for key, value in data.items():
+                    out.write(f"    {key}: {value}\n")
+            else:
+                out.write(f"    {data}\n")
+
+
+async def write_report(out: TextIO, current_datetime: str,
+                       reputations: AsyncIterator[Tuple[str, dict]]) -> None:
+    """
+    Write the full reputation report, emitting each website's block as soon as its checks finish.
+
+    Args:
+        out (TextIO): Stream to write the report to.
+        current_datetime (str): Timestamp shown in the report header.
+        reputations (AsyncIterator[Tuple[str, dict]]): Websites and their reputation data.
+    """
+    out.write(f"Report Generated on {current_datetime}\n")
+    async for website, reputation in reputations:
+        write_website_report(out, website, reputation)
+        out.flush()
+
+
+async def write_ndjson_report(out: BinaryIO, reputations: AsyncIterator[Tuple[str, dict]]) -> None:
+    """
+    Write the reputation report as newline-delimited JSON, one record per website.
+
+    Args:
+        out (BinaryIO): Binary stream to write the report to.
+        reputations (AsyncIterator[Tuple[str, dict]]): Websites and their reputation data.
+    """
+    async for website, reputation in reputations:
+        out.write(orjson.dumps({**reputation, 'domain': website}) + b"\n")
+        out.flush()
+
+
+def positive_int(value: str) -> int:
+    """
+    Argument type for options that need a whole number of at least 1.
+
+    Args:
+        value (str): The raw command-line value.
+
+    Returns:
+        int: The parsed value.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main() -> None:
     """
     The main function that parses command-line arguments, reads website lists,
@@ -237,11 +612,34 @@ def main() -> None:
         type=str,
         help="Path to the output file."
     )
+    parser.add_argument(
+        "-f", "--format",
+        choices=["text", "ndjson"],
+        default="text",
+        help="Output format: a text report, or one JSON record per line (default: text)."
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
         help="Enable verbose output."
     )
+    parser.add_argument(
+        "--cache-ttl",
+        type=positive_int,
+        default=DEFAULT_CACHE_TTL,
+        help=f"Seconds to keep cached API results (default: {DEFAULT_CACHE_TTL})."
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=positive_int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum in-flight requests to each reputation service (default: {DEFAULT_CONCURRENCY})."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk cache of API results."
+    )
     
     args = parser.parse_args()
 
@@ -261,10 +659,9 @@ def main() -> None:
     # Read websites from file if provided
     if args.websites_file:
         try:
-            with open(args.websites_file, 'r') as file:
-                file_websites = [line.strip() for line in file if line.strip()]
-                logging.debug(f"Websites loaded from file: {file_websites}")
-                websites.extend(file_websites)
+            file_websites = [line.strip() for line in read_text(args.websites_file).splitlines() if line.strip()]
+            logging.debug(f"Websites loaded from file: {file_websites}")
+            websites.extend(file_websites)
         except FileNotFoundError:
             logging.error(f"The file {args.websites_file} was not found.")
             sys.exit(1)
@@ -277,14 +674,12 @@ def main() -> None:
         logging.debug(f"Websites provided via command line: {args.website}")
         websites.extend(args.website)
 
-    # Remove potential duplicates by converting to a list of unique items while preserving order
-    seen = set()
-    unique_websites = []
+    # Remove potential duplicates by converting to a list of unique items while preserving order.
+    # setdefault keeps the first spelling seen for each website.
+    first_spelling: Dict[str, str] = {}
     for site in websites:
-        lower_site = site.lower()
-        if lower_site not in seen:
-            seen.add(lower_site)
-            unique_websites.append(site)
+        first_spelling.setdefault(site.lower(), site)
+    unique_websites = list(first_spelling.values())
 
     logging.debug(f"Combined list of unique websites to check: {unique_websites}")
 
@@ -292,40 +687,47 @@ def main() -> None:
         logging.error("No websites provided to check. Please specify via a file or command-line arguments.")
         sys.exit(1)
 
-    # Call the function to check reputation
-    results = check_reputation(unique_websites, args.preset_list, specific_websites)
-
     # Get current date and time
     current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Prepare output lines
-    output_lines = [f"Report Generated on {current_datetime}"]
-    for website, reputation in results.items():
-        output_lines.append(f"\nWebsite: {website}")
-        if "preset_status" in reputation:
-            output_lines.append(f"  Preset List Status: {reputation['preset_status']}")
+    # Validate the preset list and open the cache before touching the output file
+    preset_websites = build_preset_websites(args.preset_list, specific_websites)
+    cache_ttl = None if args.no_cache else args.cache_ttl
+
+    with reputation_cache(cache_ttl):
+        # Check reputation and write each website's block as soon as it is ready
+        reputations = iter_reputation(unique_websites, preset_websites, args.concurrency)
+
+        if args.output:
+            try:
+                out = open(args.output, 'wb' if args.format == "ndjson" else 'w')
+            except IOError:
+                logging.error(f"Could not write to the file {args.output}.")
+                sys.exit(1)
         else:
-            for service, data in reputation.items():
-                output_lines.append(f"  {service} Reputation:")
-                if isinstance(data, dict):
-                    # Pretty-print the JSON data
-                    for key, value in data.items():
-                        output_lines.append(f"    {key}: {value}")
-                else:
-                    output_lines.append(f"    {data}")
-    
-    output_text = "\n".join(output_lines)
+            out = sys.stdout.buffer if args.format == "ndjson" else sys.stdout
+
+        if args.format == "ndjson":
+            coro = write_ndjson_report(out, reputations)
+        else:
+            coro = write_report(out, current_datetime, reputations)
 
-    if args.output:
         try:
-            with open(args.output, 'w') as outfile:
-                outfile.write(output_text + "\n")
-            logging.info(f"Results have been written to {args.output}.")
-        except IOError:
-            logging.error(f"Could not write to the file {args.output}.")
-            sys.exit(1)
-    else:
-        print(output_text)
+            asyncio.run(coro)
+        except BrokenPipeError:
+            if args.output:
+                raise
+            # The reader closed the pipe early (e.g. piped into head); stop quietly and
+            # point stdout at devnull so the final flush at exit does not fail again
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return
+        finally:
+            if args.output:
+                out.close()
+
+    if args.output:
+        logging.info(f"Results have been written to {args.output}.")
 
 
 if __name__ == "__main__":